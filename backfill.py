@@ -0,0 +1,95 @@
+"""Load homework history once and seed the bot state.
+
+The API only accepts a lower bound ``from_date`` and has no paging, so
+the whole history since ``--since`` is fetched with a single request and
+merged into the state at once. Homeworks updated outside the range are
+logged and left for the bot. A failed run changes nothing and is simply
+started again.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from homework import STATE_FILE, check_response, get_api_answer
+from state import load_state, merge_homeworks, save_state, updated_at
+from users_exceptions import GetIncorrectAnswer, NotForSend
+
+logger = logging.getLogger(__name__)
+
+
+def in_range(homework, start, end):
+    """Check that the homework was last updated inside [start, end).
+
+    Homeworks without a valid date are kept.
+    """
+    try:
+        changed = updated_at(homework)
+    except (KeyError, TypeError, ValueError):
+        return True
+    return start <= changed < end
+
+
+def backfill(start, end, state_path=STATE_FILE):
+    """Fetch history for [start, end) and store it without notifications.
+
+    Returns True when the history is merged, on an API error the state
+    is left untouched.
+    """
+    try:
+        homeworks = check_response(get_api_answer(start))
+    except (GetIncorrectAnswer, NotForSend, KeyError, TypeError):
+        logger.error("Не удалось загрузить историю", exc_info=True)
+        return False
+    selected = []
+    for homework in homeworks:
+        if in_range(homework, start, end):
+            selected.append(homework)
+        else:
+            logger.warning(
+                "Работа %s обновлена вне диапазона загрузки, пропущена",
+                homework.get("id"),
+            )
+    state = load_state(state_path)
+    merge_homeworks(state["homeworks"], selected)
+    state["current_date"] = max(state["current_date"] or 0, end)
+    save_state(state_path, state)
+    logger.info("Загружено работ: %s", len(selected))
+    return True
+
+
+def parse_date(value):
+    """Turn YYYY-MM-DD or a unix timestamp into a unix timestamp."""
+    if value.isdigit():
+        return int(value)
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(
+        tzinfo=timezone.utc
+    ).timestamp())
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since", type=parse_date, default=0,
+                        help="начало истории, YYYY-MM-DD или timestamp")
+    parser.add_argument("--until", type=parse_date, default=None,
+                        help="конец истории, по умолчанию сейчас")
+    parser.add_argument("--state", default=STATE_FILE)
+    args = parser.parse_args(argv)
+
+    end = args.until or int(time.time())
+    return 0 if backfill(args.since, end, args.state) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s :: %(levelname)s :: %(message)s",
+    )
+    if not os.getenv("PRACTICUM_TOKEN"):
+        logger.critical("Отсутствует PRACTICUM_TOKEN")
+        sys.exit(1)
+    sys.exit(main())
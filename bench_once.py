@@ -0,0 +1,104 @@
+"""Benchmark cold start to exit of ``homework.py --once``.
+
+Practicum API and Telegram are replaced by a local HTTP server, so only
+the bot itself is measured. Usage: ``python bench_once.py [runs]``.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TOKEN = "1234:bench"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers like the Practicum API and the Telegram Bot API."""
+
+    def do_GET(self):
+        """Return one approved homework."""
+        self._reply({
+            "homeworks": [{
+                "id": 1, "homework_name": "hw", "status": "approved",
+                "date_updated": "2020-02-13T14:40:57Z",
+            }],
+            "current_date": int(time.time()),
+        })
+
+    def do_POST(self):
+        """Accept sendMessage."""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply({"ok": True, "result": {
+            "message_id": 1, "date": int(time.time()), "text": "ok",
+            "chat": {"id": 1, "type": "private"},
+        }})
+
+    def log_message(self, format, *args):
+        """Keep the benchmark output clean."""
+        pass
+
+    def _reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def measure(command, env, cwd, runs):
+    """Wall time of each run in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(command, env=env, cwd=cwd,
+                                capture_output=True)
+        timings.append((time.perf_counter() - started) * 1000)
+        if result.returncode:
+            sys.exit(result.stderr.decode())
+    return timings
+
+
+def report(name, timings):
+    """Print timing summary."""
+    print(f"{name:<22} min {min(timings):7.1f} ms   "
+          f"median {statistics.median(timings):7.1f} ms   "
+          f"max {max(timings):7.1f} ms")
+
+
+def main():
+    """Run the benchmark."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            PYTHONPATH=ROOT,
+            PRACTICUM_TOKEN="bench",
+            TELEGRAM_TOKEN=TOKEN,
+            TELEGRAM_CHAT_ID="1",
+            PRACTICUM_ENDPOINT=f"{url}/api/user_api/homework_statuses/",
+            TELEGRAM_API_URL=f"{url}/bot",
+            STATE_FILE=os.path.join(workdir, "state.json"),
+        )
+        python = [sys.executable]
+        report("interpreter", measure(
+            python + ["-c", "pass"], env, workdir, runs))
+        report("import homework", measure(
+            python + ["-c", "import homework"], env, workdir, runs))
+        report("homework.py --once", measure(
+            python + [os.path.join(ROOT, "homework.py"), "--once"],
+            env, workdir, runs))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
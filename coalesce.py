@@ -0,0 +1,79 @@
+"""Single-flight request coalescing with a short-lived LRU cache."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    """Request in flight that other callers wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share one call per key between concurrent callers and cache it.
+
+    While a key is being loaded every other caller with the same key
+    waits for that load and gets its result or its exception. Results
+    are kept for ``ttl`` seconds, at most ``maxsize`` keys, least
+    recently used are evicted first. Errors are never cached.
+    """
+
+    def __init__(self, ttl=60, maxsize=256, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._cache = OrderedDict()
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'shared': 0, 'loads': 0, 'evicted': 0}
+
+    def get(self, key, loader):
+        """Return a cached or shared result, call loader only if needed."""
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > self.clock():
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return cached[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['loads'] += 1
+            else:
+                self.stats['shared'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = loader()
+        except Exception as error:
+            call.error = error
+            raise
+        else:
+            self._store(key, call.result)
+            return call.result
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def clear(self):
+        """Forget all cached results."""
+        with self._lock:
+            self._cache.clear()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._cache[key] = (self.clock() + self.ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.stats['evicted'] += 1
@@ -0,0 +1,127 @@
+"""Notification destinations and concurrent fan-out."""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import requests
+
+from users_exceptions import NotForSend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+
+
+class Destination(ABC):
+    """Base class for a place where notifications are delivered."""
+
+    name = 'destination'
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    @abstractmethod
+    def send(self, message):
+        """Deliver the message or raise an exception."""
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name}>'
+
+
+class TelegramDestination(Destination):
+    """Telegram chat."""
+
+    def __init__(self, bot, chat_id, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.bot = bot
+        self.chat_id = chat_id
+        self.name = f'telegram:{chat_id}'
+
+    def send(self, message):
+        """Send message to the telegram chat."""
+        self.bot.send_message(self.chat_id, message, timeout=self.timeout)
+
+
+class WebhookDestination(Destination):
+    """Generic HTTP webhook receiving JSON."""
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.url = url
+        self.name = f'webhook:{url}'
+
+    def send(self, message):
+        """Post message to the webhook."""
+        response = requests.post(
+            self.url, json={'text': message}, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+
+class FileDestination(Destination):
+    """Local file, one message per line."""
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.path = path
+        self.name = f'file:{path}'
+
+    def send(self, message):
+        """Append message to the file."""
+        with open(self.path, 'a', encoding='UTF-8') as file:
+            file.write(message.replace('\n', ' ') + '\n')
+
+
+def fan_out(destinations, message):
+    """Send message to all destinations concurrently.
+
+    Every destination is waited for no longer than its own timeout,
+    a failed or slow destination does not affect the others.
+    Returns a dict mapping destination to an exception or None.
+    """
+    if not destinations:
+        raise NotForSend('Не настроено ни одного получателя', message)
+    if len(destinations) == 1:
+        return _send_inline(destinations[0], message)
+    results = {}
+    executor = ThreadPoolExecutor(
+        max_workers=len(destinations), thread_name_prefix='fan-out'
+    )
+    try:
+        started = time.monotonic()
+        futures = {
+            destination: executor.submit(destination.send, message)
+            for destination in destinations
+        }
+        for destination, future in futures.items():
+            remaining = started + destination.timeout - time.monotonic()
+            try:
+                future.result(timeout=max(remaining, 0))
+            except TimeoutError as error:
+                logger.warning('Получатель %s не ответил за %s с',
+                               destination.name, destination.timeout)
+                results[destination] = error
+            except Exception as e:
+                logger.warning('Не удалось отправить сообщение в %s: %s',
+                               destination.name, e)
+                results[destination] = e
+            else:
+                results[destination] = None
+    finally:
+        executor.shutdown(wait=False)
+    if all(error is not None for error in results.values()):
+        raise NotForSend(message)
+    return results
+
+
+def _send_inline(destination, message):
+    """Send to a single destination without starting threads."""
+    try:
+        destination.send(message)
+    except Exception as e:
+        logger.warning('Не удалось отправить сообщение в %s: %s',
+                       destination.name, e)
+        raise NotForSend(message) from e
+    return {destination: None}
@@ -1,5 +1,6 @@
 """Telegram bot for checking homework status."""
 
+import argparse
 import logging
 import os
 import sys
@@ -9,31 +10,83 @@ import time
 from http import HTTPStatus
 from json import JSONDecodeError
 
-from telegram import Bot, TelegramError
-from logging.handlers import RotatingFileHandler
+from telegram import Bot
 from dotenv import load_dotenv
 
+from coalesce import SingleFlight
+from destinations import (
+    FileDestination, TelegramDestination, WebhookDestination, fan_out
+)
+from latency import LatencyTracker
+from log_handlers import CompressedRotatingFileHandler, TracebackSampler
+from loop_watchdog import Watchdog
+from scheduler import delay_until_phase
+from state import load_state, merge_homeworks, save_state, updated_at
 from users_exceptions import NotForSend, GetIncorrectAnswer
 
 load_dotenv()
 
+LOG_MAX_BYTES = 30000000
+LOG_BACKUP_COUNT = 5
+LOG_MAX_AGE = 14 * 24 * 60 * 60
+
 logger = logging.getLogger(__name__)
 stream_handler = logging.StreamHandler()
-handler = RotatingFileHandler(
-    "my_logger.log", maxBytes=30000000, backupCount=5, encoding="UTF-8"
+handler = CompressedRotatingFileHandler(
+    "my_logger.log", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+    max_age=LOG_MAX_AGE
 )
+logger.addFilter(TracebackSampler())
 logger.addHandler(handler)
 logger.addHandler(stream_handler)
 
 PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_EXTRA_CHAT_IDS = os.getenv("TELEGRAM_EXTRA_CHAT_IDS", "")
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL")
+NOTIFY_FILE = os.getenv("NOTIFY_FILE")
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", 10))
+
+STATE_FILE = os.getenv("STATE_FILE", "bot_state.json")
+
+NOTIFY_SLO_SECONDS = float(os.getenv("NOTIFY_SLO_SECONDS", 900))
+NOTIFY_SLO_PERCENTILE = float(os.getenv("NOTIFY_SLO_PERCENTILE", 95))
+
+HEALTH_PORT = os.getenv("HEALTH_PORT")
+WATCHDOG_EXIT = os.getenv("WATCHDOG_EXIT", "").lower() in ("1", "true")
+
+EXIT_OK = 0
+EXIT_NO_TOKENS = 1
+EXIT_FAILURE = 2
+EXIT_NOT_SENT = 3
 
 RETRY_TIME = 600
-ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+ENDPOINT = os.getenv(
+    "PRACTICUM_ENDPOINT",
+    "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", 30))
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", 60))
+API_CACHE_WINDOW = int(os.getenv("API_CACHE_WINDOW", 60))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", 256))
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
 
+api_cache = SingleFlight(API_CACHE_TTL, API_CACHE_SIZE)
+latency = LatencyTracker(NOTIFY_SLO_SECONDS, NOTIFY_SLO_PERCENTILE)
+watchdog = Watchdog(
+    deadlines={
+        "fetch": 2 * API_TIMEOUT + 30,
+        "send": 2 * NOTIFY_TIMEOUT + 30,
+        "sleep": RETRY_TIME + 60,
+    },
+    ready_after=3 * RETRY_TIME,
+    exit_on_stall=WATCHDOG_EXIT,
+    reports={"latency": latency.report},
+)
+
 HOMEWORK_VERDICTS = {
     "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
     "reviewing": "Работа взята на проверку ревьюером.",
@@ -41,24 +94,93 @@ HOMEWORK_VERDICTS = {
 }
 
 
+def get_destinations(bot):
+    """Collect all configured notification destinations."""
+    chat_ids = [TELEGRAM_CHAT_ID] + [
+        chat_id.strip() for chat_id in TELEGRAM_EXTRA_CHAT_IDS.split(",")
+        if chat_id.strip()
+    ]
+    destinations = [
+        TelegramDestination(bot, chat_id, NOTIFY_TIMEOUT)
+        for chat_id in chat_ids
+    ]
+    if NOTIFY_WEBHOOK_URL:
+        destinations.append(
+            WebhookDestination(NOTIFY_WEBHOOK_URL, NOTIFY_TIMEOUT)
+        )
+    if NOTIFY_FILE:
+        destinations.append(FileDestination(NOTIFY_FILE, NOTIFY_TIMEOUT))
+    return destinations
+
+
 def send_message(bot, message):
-    """Send homework status to your telegram."""
-    try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-    except TelegramError as e:
-        raise NotForSend(message) from e
-    else:
-        logger.info("Сообщение отправлено успешно")
+    """Send homework status to all destinations at once."""
+    results = fan_out(get_destinations(bot), message)
+    delivered = sum(error is None for error in results.values())
+    logger.info(
+        "Сообщение отправлено успешно (%s из %s)", delivered, len(results)
+    )
+
+
+def notify_error(bot, message):
+    """Report an operational error to the operator chat only."""
+    fan_out(
+        [TelegramDestination(bot, TELEGRAM_CHAT_ID, NOTIFY_TIMEOUT)], message
+    )
+    logger.info("Сообщение о сбое отправлено")
 
 
 def get_api_answer(current_timestamp):
     """Create a request to an api resource."""
+    return request_api(HEADERS, current_timestamp)
+
+
+def get_shared_api_answer(token, from_date):
+    """Get homeworks of the token, sharing requests between subscribers.
+
+    Callers whose from_date falls into the same API_CACHE_WINDOW share one
+    request made from the window start, then only homeworks updated since
+    their own from_date are returned. A cached answer may be older than
+    the caller's from_date, so current_date never goes below it.
+    """
+    window_start = int(from_date) - int(from_date) % API_CACHE_WINDOW
+    response = api_cache.get(
+        (token, window_start),
+        lambda: request_api(
+            {"Authorization": f"OAuth {token}"}, window_start
+        ),
+    )
+    homeworks = response.get("homeworks") if isinstance(
+        response, dict
+    ) else None
+    if not isinstance(homeworks, list):
+        return response
+    shared = dict(response, homeworks=[
+        homework for homework in homeworks
+        if _updated_since(homework, from_date)
+    ])
+    if isinstance(response.get("current_date"), (int, float)):
+        shared["current_date"] = max(response["current_date"], from_date)
+    return shared
+
+
+def _updated_since(homework, timestamp):
+    try:
+        return updated_at(homework) >= timestamp
+    except (KeyError, TypeError, ValueError):
+        return True
+
+
+def request_api(headers, current_timestamp):
+    """Request homework statuses changed since the timestamp."""
     requests_params = dict(
         url=ENDPOINT,
         params={"from_date": current_timestamp}
     )
     try:
-        response = requests.get(headers=HEADERS, **requests_params)
+        response = requests.get(
+            headers=headers, timeout=API_TIMEOUT, **requests_params
+        )
     except requests.exceptions.RequestException as e:
         raise GetIncorrectAnswer(requests_params) from e
 
@@ -109,38 +231,146 @@ def check_tokens():
     return all([PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID])
 
 
+def get_bot():
+    """Create a telegram bot."""
+    if TELEGRAM_API_URL:
+        return Bot(token=TELEGRAM_TOKEN, base_url=TELEGRAM_API_URL)
+    return Bot(token=TELEGRAM_TOKEN)
+
+
+def track_latency(homework, poll_started, fetched):
+    """Record how long the status change took to reach the user."""
+    try:
+        changed = updated_at(homework)
+    except (KeyError, TypeError, ValueError):
+        logger.warning("Нет корректной даты обновления работы")
+        return
+    latency.record(changed, poll_started, fetched, time.time())
+
+
+def check_homework(bot, state):
+    """Poll the API once and notify about the latest homework."""
+    poll_started = time.time()
+    with watchdog.stage("fetch"):
+        response = get_api_answer(state["current_date"])
+        try:
+            homeworks = check_response(response)
+        except NotForSend as error:
+            # a broken answer is a data error, not a failed delivery
+            raise GetIncorrectAnswer(*error.args) from error
+    fetched = time.time()
+    if homeworks:
+        try:
+            message = parse_status(homeworks[0])
+        except KeyError:
+            # a homework we cannot describe is skipped, retrying the
+            # same answer would fail on every poll
+            state["current_date"] = response["current_date"]
+            raise
+    else:
+        message = 'Список домашних работ пуст'
+    with watchdog.stage("send"):
+        send_message(bot, message)
+    state["current_date"] = response["current_date"]
+    if homeworks:
+        track_latency(homeworks[0], poll_started, fetched)
+    merge_homeworks(state["homeworks"], homeworks)
+
+
+def load_bot_state():
+    """Read the saved state, a new bot starts from the current time."""
+    state = load_state(STATE_FILE)
+    if state["current_date"] is None:
+        state["current_date"] = int(time.time())
+    latency.load(state.get("latency", {}))
+    return state
+
+
+def save_bot_state(state):
+    """Save the state together with latency samples."""
+    state["latency"] = latency.dump()
+    save_state(STATE_FILE, state)
+
+
+def wait_for_phase():
+    """Sleep until the phase of our token inside RETRY_TIME.
+
+    Instances started together spread their polls over the interval
+    instead of hitting the API at the same moment.
+    """
+    with watchdog.stage("sleep"):
+        time.sleep(delay_until_phase(PRACTICUM_TOKEN, RETRY_TIME))
+
+
+def run_once():
+    """Run exactly one cycle and return the process exit status."""
+    if not check_tokens():
+        logger.critical("Отсутствует один из ключей")
+        return EXIT_NO_TOKENS
+    state = load_bot_state()
+    bot = get_bot()
+    try:
+        check_homework(bot, state)
+    except NotForSend:
+        logger.error("Сбой в работе программы", exc_info=True)
+        return EXIT_NOT_SENT
+    except Exception as error:
+        logger.error("Сбой в работе программы", exc_info=True)
+        try:
+            with watchdog.stage("send"):
+                notify_error(bot, f"Сбой в работе программы: {error}")
+        except NotForSend:
+            logger.error("Не удалось сообщить о сбое", exc_info=True)
+        return EXIT_FAILURE
+    finally:
+        save_bot_state(state)
+    return EXIT_OK
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
         message = "Отсутствует один из ключей"
         logger.critical("Отсутствует один из ключей", exc_info=True)
-        sys.exit(1)
-    current_timestamp = int(time.time())
+        sys.exit(EXIT_NO_TOKENS)
+    watchdog.start(port=int(HEALTH_PORT) if HEALTH_PORT else None)
+    state = load_bot_state()
+    wait_for_phase()
     while True:
-        bot = Bot(token=TELEGRAM_TOKEN)
+        bot = get_bot()
         try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            current_timestamp = response.get("current_date")
-            if homeworks:
-                message = parse_status(homeworks[0])
-            else:
-                message = 'Список домашних работ пуст'
-            send_message(bot, message)
+            check_homework(bot, state)
+            save_bot_state(state)
+            watchdog.cycle_succeeded()
         except NotForSend:
             logger.error("Сбой в работе программы", exc_info=True)
         except Exception as error:
             message = f"Сбой в работе программы: {error}"
             logger.error("Сбой в работе программы", exc_info=True)
-            send_message(bot, message)
+            try:
+                with watchdog.stage("send"):
+                    notify_error(bot, message)
+            except NotForSend:
+                logger.error("Не удалось сообщить о сбое", exc_info=True)
         finally:
-            time.sleep(RETRY_TIME)
+            wait_for_phase()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--once", action="store_true",
+        help="выполнить одну проверку и завершиться (для cron)"
+    )
+    args = parser.parse_args()
     logging.basicConfig(
         level=logging.DEBUG,
-        filename=os.path.abspath("homework.log"),
+        handlers=[CompressedRotatingFileHandler(
+            os.path.abspath("homework.log"), maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT, max_age=LOG_MAX_AGE
+        )],
         format="%(asctime)s :: %(levelname)s :: %(message)s",
     )
+    if args.once:
+        sys.exit(run_once())
     main()
@@ -0,0 +1,120 @@
+"""End-to-end notification latency against an SLO."""
+
+import logging
+import math
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('total', 'polling', 'fetch', 'send')
+
+
+class RollingPercentiles:
+    """Percentiles over the last ``size`` samples."""
+
+    def __init__(self, size=200, samples=()):
+        self.samples = deque(samples, maxlen=size)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, value):
+        """Remember a sample."""
+        self.samples.append(value)
+
+    def percentile(self, q):
+        """Nearest-rank percentile, None without samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(math.ceil(q / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def summary(self):
+        """Count and the usual percentiles."""
+        return {
+            'count': len(self),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class LatencyTracker:
+    """Delay between a status change and a delivered notification.
+
+    Every notification is split into polling delay (status changed ->
+    poll started), fetch (API request and checks) and send (message
+    rendering, queueing and delivery).
+    """
+
+    def __init__(self, slo, percentile=95, size=200):
+        self.slo = slo
+        self.slo_percentile = percentile
+        self.size = size
+        self.stages = {stage: RollingPercentiles(size) for stage in STAGES}
+        self.breached = False
+
+    def record(self, updated_at, poll_started, fetched, sent):
+        """Add one notification, return its breakdown in seconds."""
+        breakdown = {
+            'total': max(sent - updated_at, 0),
+            'polling': max(poll_started - updated_at, 0),
+            'fetch': fetched - poll_started,
+            'send': sent - fetched,
+        }
+        for stage, value in breakdown.items():
+            self.stages[stage].add(value)
+        logger.info(
+            'Задержка уведомления %.1f с: опрос %.1f с, запрос %.1f с, '
+            'отправка %.1f с', breakdown['total'], breakdown['polling'],
+            breakdown['fetch'], breakdown['send']
+        )
+        self._check_slo()
+        return breakdown
+
+    def current(self):
+        """Total latency at the SLO percentile."""
+        return self.stages['total'].percentile(self.slo_percentile)
+
+    def slo_breached(self):
+        """Whether the SLO percentile is over the target."""
+        current = self.current()
+        return current is not None and current > self.slo
+
+    def _check_slo(self):
+        """Log only when the SLO becomes breached or is met again."""
+        breached = self.slo_breached()
+        if breached and not self.breached:
+            logger.warning(
+                'Задержка уведомлений p%s %.1f с превышает SLO %s с',
+                self.slo_percentile, self.current(), self.slo
+            )
+        elif self.breached and not breached:
+            logger.info('Задержка уведомлений снова в пределах SLO')
+        self.breached = breached
+
+    def report(self):
+        """Percentiles of every stage and the SLO status."""
+        return {
+            'slo': self.slo,
+            'slo_percentile': self.slo_percentile,
+            'slo_breached': self.slo_breached(),
+            **{stage: rolling.summary()
+               for stage, rolling in self.stages.items()},
+        }
+
+    def dump(self):
+        """Samples as plain lists for the state file."""
+        return {
+            stage: list(rolling.samples)
+            for stage, rolling in self.stages.items()
+        }
+
+    def load(self, data):
+        """Restore samples saved by dump()."""
+        self.stages = {
+            stage: RollingPercentiles(self.size, data.get(stage, ()))
+            for stage in STAGES
+        }
+        self.breached = self.slo_breached()
@@ -0,0 +1,164 @@
+"""Log handlers with compressed rotation and traceback sampling."""
+
+import glob
+import gzip
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging.handlers import RotatingFileHandler
+
+_compressor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix='log-compress'
+)
+# numbered backups of RotatingFileHandler and our own rotated files
+# left uncompressed by a crash
+_UNCOMPRESSED = re.compile(r'\d+|\d{8}-\d{6}(-\d+)?')
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """Rotate by size, gzip rotated files in background, drop old ones.
+
+    Rotated files are named ``<file>.<YYYYmmdd-HHMMSS>.gz``. At most
+    ``backupCount`` archives are kept, archives older than ``max_age``
+    seconds are removed on every rollover and when the handler opens.
+    Numbered backups ``<file>.1`` left by RotatingFileHandler are
+    compressed on open and then pruned like the other archives.
+    """
+
+    def __init__(self, filename, maxBytes, backupCount, max_age=None,
+                 encoding="UTF-8"):
+        super().__init__(
+            filename, maxBytes=maxBytes, backupCount=backupCount,
+            encoding=encoding
+        )
+        self.max_age = max_age
+        self._pending = [_compressor.submit(self._archive_leftovers)]
+
+    def doRollover(self):
+        """Move the current file aside and schedule its compression."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            rotated = self._rotated_name()
+            os.rename(self.baseFilename, rotated)
+            self._pending = [
+                future for future in self._pending if not future.done()
+            ]
+            self._pending.append(_compressor.submit(self._archive, rotated))
+        if not self.delay:
+            self.stream = self._open()
+
+    def wait_archived(self, timeout=None):
+        """Block until scheduled compressions are finished."""
+        wait(self._pending, timeout=timeout)
+
+    def close(self):
+        """Close the file and let pending archives complete."""
+        super().close()
+        self.wait_archived()
+
+    def _rotated_name(self):
+        name = f'{self.baseFilename}.{time.strftime("%Y%m%d-%H%M%S")}'
+        candidate, suffix = name, 0
+        while os.path.exists(candidate) or os.path.exists(candidate + '.gz'):
+            suffix += 1
+            candidate = f'{name}-{suffix}'
+        return candidate
+
+    def _archive(self, path):
+        self._compress(path)
+        self._prune()
+
+    def _archive_leftovers(self):
+        prefix = self.baseFilename + '.'
+        for path in glob.glob(glob.escape(prefix) + '*'):
+            if _UNCOMPRESSED.fullmatch(path[len(prefix):]):
+                self._compress(path)
+        self._prune()
+
+    @staticmethod
+    def _compress(path):
+        partial = path + '.gz.part'
+        with open(path, 'rb') as source, gzip.open(partial, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        stat = os.stat(path)
+        os.utime(partial, (stat.st_atime, stat.st_mtime))
+        os.replace(partial, path + '.gz')
+        os.remove(path)
+
+    def _prune(self):
+        archives = sorted(
+            glob.glob(glob.escape(self.baseFilename) + '.*.gz'),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        now = time.time()
+        for index, archive in enumerate(archives):
+            expired = (
+                self.max_age is not None
+                and now - os.path.getmtime(archive) > self.max_age
+            )
+            if index >= self.backupCount or expired:
+                try:
+                    os.remove(archive)
+                except FileNotFoundError:
+                    pass
+
+
+class TracebackSampler(logging.Filter):
+    """Write an identical traceback in full only once per window.
+
+    Repeats are reduced to a single line with the exception and a counter,
+    so an outage does not fill the disk with the same trace every cycle.
+    """
+
+    max_signatures = 256
+
+    def __init__(self, window=3600):
+        super().__init__()
+        self.window = window
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        """Strip the traceback from repeated records."""
+        if not record.exc_info or record.exc_info[0] is None:
+            return True
+        exc_type, exc, tb = record.exc_info
+        signature = (exc_type, tuple(
+            (frame.filename, frame.lineno)
+            for frame in traceback.extract_tb(tb)
+        ))
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(signature)
+            if seen is None or now - seen[0] > self.window:
+                self._forget_old(now)
+                self._seen[signature] = [now, 0]
+                return True
+            seen[1] += 1
+            repeats = seen[1]
+        record.msg = (
+            f'{record.getMessage()} ({exc_type.__name__}: {exc}, '
+            f'повтор {repeats})'
+        )
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return True
+
+    def _forget_old(self, now):
+        if len(self._seen) < self.max_signatures:
+            return
+        self._seen = {
+            signature: seen for signature, seen in self._seen.items()
+            if now - seen[0] <= self.window
+        }
+        if len(self._seen) >= self.max_signatures:
+            self._seen.clear()
@@ -0,0 +1,194 @@
+"""Watchdog for a stalled main loop with a liveness endpoint."""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+EXIT_STALLED = 4
+FLUSH_TIMEOUT = 2
+
+
+def format_stacks():
+    """Stacks of all running threads as text."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    chunks = []
+    for ident, frame in sys._current_frames().items():
+        chunks.append(f'Поток {names.get(ident, ident)}:\n')
+        chunks.extend(traceback.format_stack(frame))
+    return ''.join(chunks)
+
+
+def flush_logs(timeout):
+    """Flush handlers of this logger and its parents, wait up to timeout.
+
+    A handler stuck on a hung disk or network must not keep a stalled
+    process from exiting, so flushing runs in a separate daemon thread.
+    """
+    handlers = []
+    current = logger
+    while current is not None:
+        handlers.extend(current.handlers)
+        current = current.parent if current.propagate else None
+
+    def flush():
+        for handler in handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=flush, name='log-flush', daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+
+class Watchdog:
+    """Watch heartbeats of loop stages and react when one hangs.
+
+    ``deadlines`` maps a stage name to the longest time it may take.
+    When the running stage is late the stacks of all threads are logged
+    once, and with ``exit_on_stall`` the process exits so the supervisor
+    restarts it. ``reports`` maps a name to a callable whose result is
+    added to the status.
+    """
+
+    def __init__(self, deadlines, ready_after, check_interval=5,
+                 exit_on_stall=False, reports=None, clock=time.monotonic):
+        self.deadlines = deadlines
+        self.reports = reports or {}
+        self.ready_after = ready_after
+        self.check_interval = check_interval
+        self.exit_on_stall = exit_on_stall
+        self.clock = clock
+        self.started = clock()
+        self.heartbeats = {}
+        self.last_success = None
+        self.stalled = None
+        self._active = None
+        self._thread = None
+        self._server = None
+        self._stop = threading.Event()
+
+    @contextmanager
+    def stage(self, name):
+        """Mark the block as a running stage of the loop."""
+        self.beat(name)
+        self._active = (name, self.clock())
+        try:
+            yield
+        finally:
+            self._active = None
+            self.stalled = None
+            self.beat(name)
+
+    def beat(self, name):
+        """Record that the stage is alive."""
+        self.heartbeats[name] = self.clock()
+
+    def cycle_succeeded(self):
+        """Record a fully successful cycle."""
+        self.last_success = self.clock()
+
+    def check(self):
+        """Return the stalled stage name, dump stacks on a new stall."""
+        active = self._active
+        if active is None:
+            return None
+        name, started = active
+        deadline = self.deadlines.get(name)
+        if deadline is None or self.clock() - started <= deadline:
+            return None
+        if self.stalled != active:
+            self.stalled = active
+            logger.critical(
+                'Этап %s выполняется дольше %s с, стеки потоков:\n%s',
+                name, deadline, format_stacks()
+            )
+            if self.exit_on_stall:
+                flush_logs(FLUSH_TIMEOUT)
+                os._exit(EXIT_STALLED)
+        return name
+
+    def status(self):
+        """Liveness and readiness of the loop."""
+        now = self.clock()
+        stalled = self.check()
+        age = None if self.last_success is None else now - self.last_success
+        return {
+            'alive': stalled is None,
+            'ready': age is not None and age <= self.ready_after,
+            'stalled_stage': stalled,
+            'stage': self._active[0] if self._active else None,
+            'last_success_age': age,
+            'uptime': now - self.started,
+            'heartbeat_ages': {
+                name: now - beat for name, beat in self.heartbeats.items()
+            },
+            **{name: report() for name, report in self.reports.items()},
+        }
+
+    def start(self, port=None, host='127.0.0.1'):
+        """Start the watchdog thread and, with a port, the HTTP endpoint."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='watchdog', daemon=True
+            )
+            self._thread.start()
+        if port is not None and self._server is None:
+            self._server = ThreadingHTTPServer(
+                (host, port), _health_handler(self)
+            )
+            threading.Thread(
+                target=self._server.serve_forever, name='health',
+                daemon=True
+            ).start()
+            logger.info('Проверка состояния доступна на %s:%s', host,
+                        self._server.server_port)
+
+    def stop(self):
+        """Stop the thread and the endpoint."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+
+def _health_handler(watchdog):
+    class HealthHandler(BaseHTTPRequestHandler):
+        """GET /healthz for liveness and /readyz for readiness."""
+
+        def do_GET(self):
+            status = watchdog.status()
+            checks = {'/healthz': 'alive', '/readyz': 'ready'}
+            if self.path not in checks:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            ok = status[checks[self.path]]
+            body = json.dumps(status).encode()
+            self.send_response(
+                HTTPStatus.OK if ok else HTTPStatus.SERVICE_UNAVAILABLE
+            )
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return HealthHandler
@@ -0,0 +1,220 @@
+"""Hierarchical timing wheel for staggered periodic polls."""
+
+import logging
+import statistics
+import threading
+import time
+import zlib
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+def phase_offset(key, interval):
+    """Stable offset of the key inside the interval, in seconds.
+
+    crc32 is used instead of hash() so every process and every host
+    gets the same offset for the same key.
+    """
+    return zlib.crc32(str(key).encode()) / 2 ** 32 * interval
+
+
+def delay_until_phase(key, interval, now=None):
+    """Seconds left until the next phase-aligned run of the key."""
+    if now is None:
+        now = time.time()
+    delay = (phase_offset(key, interval) - now) % interval
+    return delay or interval
+
+
+class _Timer:
+    """Periodic target placed into a wheel slot."""
+
+    __slots__ = ('key', 'callback', 'interval', 'expires', 'level', 'slot')
+
+    def __init__(self, key, callback, interval):
+        self.key = key
+        self.callback = callback
+        self.interval = interval
+        self.expires = None
+        self.level = None
+        self.slot = None
+
+
+class TimingWheel:
+    """Hierarchical timing wheel driven by a single timer thread.
+
+    Level 0 has ``slots`` slots of ``tick`` seconds, every next level
+    covers a full turn of the previous one. Adding, rescheduling and
+    removing a target are O(1); on every tick only one slot is fired and
+    timers from upper levels are cascaded down when their turn comes.
+    """
+
+    def __init__(self, tick=1.0, slots=64, levels=4, clock=time.time,
+                 executor=None, history=None):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.clock = clock
+        self.executor = executor
+        self._wheels = [
+            [dict() for _ in range(slots)] for _ in range(levels)
+        ]
+        self._targets = {}
+        self._current = int(clock() // tick)
+        self._history = history
+        self._fired = deque(maxlen=history or slots)
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._targets)
+
+    def add_target(self, key, callback, interval, phase_key=None):
+        """Poll the key every interval seconds at its own phase.
+
+        Targets with the same ``phase_key`` share the phase, by default
+        every key has its own.
+        """
+        with self._lock:
+            if key in self._targets:
+                self.remove_target(key)
+            timer = _Timer(key, callback, max(int(interval // self.tick), 1))
+            if self._history is None and timer.interval > self._fired.maxlen:
+                self._fired = deque(self._fired, maxlen=timer.interval)
+            now = self._current * self.tick
+            first = now + delay_until_phase(
+                key if phase_key is None else phase_key, interval, now
+            )
+            timer.expires = max(int(-(-first // self.tick)), self._current + 1)
+            self._targets[key] = timer
+            self._place(timer)
+
+    def reschedule(self, key, delay):
+        """Run the key after delay seconds, then keep its interval."""
+        with self._lock:
+            timer = self._targets[key]
+            self._unplace(timer)
+            timer.expires = self._current + max(int(delay // self.tick), 1)
+            self._place(timer)
+
+    def remove_target(self, key):
+        """Stop polling the key."""
+        with self._lock:
+            timer = self._targets.pop(key, None)
+            if timer is not None:
+                self._unplace(timer)
+
+    def advance(self, now=None):
+        """Fire every tick up to now, return the number of fired targets."""
+        if now is None:
+            now = self.clock()
+        target = int(now // self.tick)
+        fired = 0
+        while True:
+            with self._lock:
+                if self._current >= target:
+                    return fired
+                self._current += 1
+                self._cascade(self._current)
+                slot = self._wheels[0][self._current % self.slots]
+                due = [
+                    timer for timer in slot.values()
+                    if timer.expires <= self._current
+                ]
+                for timer in due:
+                    self._unplace(timer)
+                    timer.expires += timer.interval
+                    if timer.expires <= self._current:
+                        timer.expires = self._current + timer.interval
+                    self._place(timer)
+                self._fired.append(len(due))
+            for timer in due:
+                self._dispatch(timer)
+            fired += len(due)
+
+    def spread(self):
+        """Report how evenly fires are spread over the recent ticks.
+
+        Unless ``history`` is given, the longest target interval is kept,
+        so the report covers a full polling round.
+        """
+        with self._lock:
+            fired = list(self._fired)
+        if not fired:
+            return {'targets': len(self), 'ticks': 0, 'mean': 0.0,
+                    'peak': 0, 'peak_to_mean': 0.0, 'stdev': 0.0}
+        mean = statistics.mean(fired)
+        peak = max(fired)
+        return {
+            'targets': len(self),
+            'ticks': len(fired),
+            'mean': mean,
+            'peak': peak,
+            'peak_to_mean': peak / mean if mean else 0.0,
+            'stdev': statistics.pstdev(fired),
+        }
+
+    def start(self):
+        """Run the wheel on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='timing-wheel', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            next_tick = (self._current + 1) * self.tick
+            if self._stop.wait(max(next_tick - self.clock(), 0)):
+                break
+            self.advance()
+
+    def _dispatch(self, timer):
+        if self.executor is not None:
+            self.executor.submit(self._fire, timer)
+        else:
+            self._fire(timer)
+
+    @staticmethod
+    def _fire(timer):
+        try:
+            timer.callback(timer.key)
+        except Exception:
+            logger.error('Сбой при опросе %s', timer.key, exc_info=True)
+
+    def _place(self, timer):
+        delta = timer.expires - self._current
+        span = self.slots
+        for level in range(self.levels):
+            if delta < span or level == self.levels - 1:
+                break
+            span *= self.slots
+        expires = min(timer.expires, self._current + span - 1)
+        slot = (expires // (span // self.slots)) % self.slots
+        timer.level, timer.slot = level, slot
+        self._wheels[level][slot][timer.key] = timer
+
+    def _unplace(self, timer):
+        if timer.level is not None:
+            self._wheels[timer.level][timer.slot].pop(timer.key, None)
+            timer.level = timer.slot = None
+
+    def _cascade(self, tick):
+        for level in range(self.levels - 1, 0, -1):
+            if tick % self.slots ** level:
+                continue
+            slot = self._wheels[level][(tick // self.slots ** level)
+                                       % self.slots]
+            timers = list(slot.values())
+            slot.clear()
+            for timer in timers:
+                timer.level = timer.slot = None
+                self._place(timer)
@@ -0,0 +1,65 @@
+"""Persistent bot state stored as a json file."""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def empty_state():
+    """State of a bot that has never run."""
+    return {"current_date": None, "homeworks": {}}
+
+
+def load_state(path):
+    """Read the state, a missing or broken file gives an empty state."""
+    state = empty_state()
+    try:
+        with open(path, encoding="UTF-8") as file:
+            state.update(json.load(file))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError):
+        logger.warning("Не удалось прочитать состояние %s", path,
+                       exc_info=True)
+    return state
+
+
+def save_state(path, state):
+    """Write the state atomically, so a crash never leaves half a file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(
+        dir=directory, prefix=".state-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "w", encoding="UTF-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def updated_at(homework):
+    """Unix time of the last homework update."""
+    return datetime.strptime(
+        homework["date_updated"], DATE_FORMAT
+    ).replace(tzinfo=timezone.utc).timestamp()
+
+
+def merge_homeworks(known, homeworks):
+    """Merge homeworks into known by id, the latest update wins."""
+    for homework in homeworks:
+        key = str(homework.get("id", homework.get("homework_name")))
+        current = known.get(key)
+        if current is None or (
+            homework.get("date_updated", "")
+            >= current.get("date_updated", "")
+        ):
+            known[key] = homework
+    return known
@@ -0,0 +1,133 @@
+"""Poll homework statuses for several subscribers from one process.
+
+A subscriber is a telegram chat following a Practicum token, they are
+listed in a json file: ``[{"token": "...", "chat_id": 123}, ...]``.
+All subscribers are driven by one TimingWheel. Subscribers of the same
+token share its phase, so their requests fall into one window and are
+coalesced by ``get_shared_api_answer``. Usage:
+``python subscribers.py subscribers.json``.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from destinations import TelegramDestination, fan_out
+from scheduler import TimingWheel
+from state import load_state, save_state
+from users_exceptions import GetIncorrectAnswer, NotForSend
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "subscribers_state.json"
+WORKERS = 8
+REPORT_INTERVAL = 3600
+
+
+def load_subscribers(path):
+    """Read and check the list of subscribers."""
+    with open(path, encoding="UTF-8") as file:
+        subscribers = json.load(file)
+    if not isinstance(subscribers, list):
+        raise TypeError("Список подписчиков должен быть списком")
+    for subscriber in subscribers:
+        if not subscriber.get("token") or not subscriber.get("chat_id"):
+            raise KeyError("У подписчика должны быть token и chat_id")
+    return subscribers
+
+
+def subscriber_key(subscriber):
+    """Stable key of a subscriber that does not reveal the token."""
+    digest = hashlib.sha256(subscriber["token"].encode()).hexdigest()[:8]
+    return f'{subscriber["chat_id"]}:{digest}'
+
+
+class SubscriberPoller:
+    """Poll the API for one subscriber and keep its cursor."""
+
+    def __init__(self, bot, subscribers, state_path=STATE_FILE):
+        self.bot = bot
+        self.subscribers = {
+            subscriber_key(subscriber): subscriber
+            for subscriber in subscribers
+        }
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        self.cursors = self.state.setdefault("subscribers", {})
+        self._lock = threading.Lock()
+
+    def poll(self, key):
+        """One cycle for the subscriber, called by the timing wheel."""
+        subscriber = self.subscribers[key]
+        with self._lock:
+            from_date = self.cursors.get(key) or int(time.time())
+        try:
+            response = homework.get_shared_api_answer(
+                subscriber["token"], from_date
+            )
+            homeworks = homework.check_response(response)
+            if homeworks:
+                fan_out(
+                    [TelegramDestination(self.bot, subscriber["chat_id"],
+                                         homework.NOTIFY_TIMEOUT)],
+                    homework.parse_status(homeworks[0]),
+                )
+        except (GetIncorrectAnswer, NotForSend, KeyError, TypeError):
+            logger.error("Сбой при опросе подписчика %s", key,
+                         exc_info=True)
+            return
+        with self._lock:
+            self.cursors[key] = response["current_date"]
+            save_state(self.state_path, self.state)
+
+
+def schedule(poller, wheel, interval):
+    """Add every subscriber to the wheel, phased by its token."""
+    for key, subscriber in poller.subscribers.items():
+        wheel.add_target(key, poller.poll, interval,
+                         phase_key=subscriber["token"])
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("subscribers", help="json файл с подписчиками")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical("Отсутствует TELEGRAM_TOKEN")
+        return homework.EXIT_NO_TOKENS
+    poller = SubscriberPoller(
+        homework.get_bot(), load_subscribers(args.subscribers), args.state
+    )
+    executor = ThreadPoolExecutor(
+        max_workers=args.workers, thread_name_prefix="subscriber"
+    )
+    wheel = TimingWheel(executor=executor)
+    schedule(poller, wheel, homework.RETRY_TIME)
+    wheel.start()
+    logger.info("Подписчиков: %s", len(wheel))
+    try:
+        while True:
+            time.sleep(REPORT_INTERVAL)
+            logger.info("Равномерность опросов: %s", wheel.spread())
+    except KeyboardInterrupt:
+        wheel.stop()
+        executor.shutdown()
+    return homework.EXIT_OK
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s :: %(levelname)s :: %(message)s",
+    )
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Fault injection harness for the main loop of the bot.
+
+Runs the real ``homework.main()`` on a virtual clock against a fake
+Practicum API and a fake Telegram bot, injects faults on a schedule of
+cycle numbers and reports lost and duplicated notifications, time to
+recover and throughput. ``python tests/fault_injection.py`` prints the
+report for the built-in scenarios.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from unittest import mock
+
+import requests
+import telegram
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import homework  # noqa: E402
+import scheduler  # noqa: E402
+from tests.fixtures.fixture_data import RecordingBot  # noqa: E402
+
+API_FAULTS = (
+    'latency', 'reset', 'truncated', 'invalid_json',
+    'http_429', 'http_500', 'http_503',
+)
+BOT_FAULTS = ('telegram_network', 'telegram_timeout', 'telegram_retry_after')
+
+START = 1600000000
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+class StopHarness(BaseException):
+    """Raised from the fake sleep to leave main() after the last cycle."""
+
+
+class InjectedCrash(Exception):
+    """Raised from the fake sleep to kill main() after a cycle."""
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeBot(RecordingBot):
+
+    def __init__(self, harness):
+        super().__init__()
+        self.harness = harness
+
+    def send_message(self, chat_id, text, **kwargs):
+        fault = self.harness.bot_faults.get(self.harness.cycle)
+        if fault == 'telegram_network':
+            raise telegram.error.NetworkError('Connection reset by peer')
+        if fault == 'telegram_timeout':
+            raise telegram.error.TimedOut()
+        if fault == 'telegram_retry_after':
+            raise telegram.error.RetryAfter(30)
+        super().send_message(chat_id, text, **kwargs)
+        self.harness.current['delivered'] += 1
+        if text.startswith('Изменился статус'):
+            self.harness.current['notified'].append(text)
+
+
+class FaultHarness:
+    """Run main() for a number of cycles with scheduled faults.
+
+    ``events`` are ``(seconds_from_start, homework_id, status)`` status
+    changes of the fake API. ``api_faults`` and ``bot_faults`` map a cycle
+    number to the fault injected in that cycle, main() is killed after
+    every cycle listed in ``crash_after``.
+    """
+
+    def __init__(self, events=(), api_faults=None, bot_faults=None,
+                 crash_after=(), spike=120, restart_delay=30,
+                 state_file=None):
+        self.events = sorted(events)
+        self.api_faults = api_faults or {}
+        self.bot_faults = bot_faults or {}
+        self.crash_after = set(crash_after)
+        self.spike = spike
+        self.restart_delay = restart_delay
+        self.state_file = state_file
+        self.now = START
+        self.cycle = 0
+        self.cycles = []
+        self.crashes = []
+        self.bot = FakeBot(self)
+        self.current = self._new_cycle()
+
+    def run(self, cycles):
+        """Drive the loop, return the report."""
+        self.limit = cycles
+        with ExitStack() as stack:
+            if self.state_file is None:
+                directory = stack.enter_context(tempfile.TemporaryDirectory())
+                self.state_file = os.path.join(directory, 'state.json')
+            self._patch(stack)
+            while self.cycle < self.limit:
+                try:
+                    homework.main()
+                except StopHarness:
+                    break
+                except Exception as error:
+                    self._crash(error)
+        return self.report()
+
+    def report(self):
+        """Numbers describing the run."""
+        expected = Counter(
+            homework.parse_status(
+                {'homework_name': f'hw{id}', 'status': status}
+            )
+            for at, id, status in self.events
+            if START + at <= self.now
+        )
+        delivered = Counter(
+            text for cycle in self.cycles for text in cycle['notified']
+        )
+        elapsed = self.now - START
+        ok_cycles = sum(cycle['ok'] for cycle in self.cycles)
+        recoveries = self._recoveries()
+        return {
+            'cycles': len(self.cycles),
+            'ok_cycles': ok_cycles,
+            'expected': sum(expected.values()),
+            'delivered': sum(delivered.values()),
+            'lost': sum((expected - delivered).values()),
+            'duplicated': sum((delivered - expected).values()),
+            'crashes': len(self.crashes),
+            'recoveries': recoveries,
+            'max_time_to_recover': max(
+                (r for r in recoveries if r is not None), default=0
+            ) if None not in recoveries else None,
+            'elapsed': elapsed,
+            'throughput_per_hour': ok_cycles / elapsed * 3600
+            if elapsed else 0.0,
+        }
+
+    def _patch(self, stack):
+        patches = {
+            'time': self,
+            'PRACTICUM_TOKEN': 'token',
+            'TELEGRAM_TOKEN': '1234:abcdefg',
+            'TELEGRAM_CHAT_ID': 1,
+            'TELEGRAM_EXTRA_CHAT_IDS': '',
+            'NOTIFY_WEBHOOK_URL': None,
+            'NOTIFY_FILE': None,
+            'STATE_FILE': self.state_file,
+            'get_bot': lambda: self.bot,
+            'delay_until_phase': lambda key, interval: (
+                scheduler.delay_until_phase(key, interval, self.now)
+            ),
+        }
+        for name, value in patches.items():
+            stack.enter_context(mock.patch.object(homework, name, value))
+        stack.enter_context(mock.patch.object(requests, 'get', self.get))
+
+    def time(self):
+        """Current virtual time."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Advance the virtual clock and end the cycle.
+
+        The phase wait before the first poll has no requests yet and
+        only moves the clock.
+        """
+        if self.current['requests'] or self.current['delivered']:
+            self._finish_cycle()
+            if self.cycle - 1 in self.crash_after:
+                self.current = self._new_cycle()
+                raise InjectedCrash(f'цикл {self.cycle - 1}')
+        self.now += seconds
+        self.current = self._new_cycle()
+        if self.cycle >= self.limit:
+            raise StopHarness
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        """Answer like the Practicum API, unless a fault is scheduled."""
+        self.current['requests'] += 1
+        fault = self.api_faults.get(self.cycle)
+        if fault == 'latency':
+            self.now += self.spike
+        if fault == 'reset':
+            raise requests.exceptions.ConnectionError('Connection reset')
+        if fault in ('http_429', 'http_500', 'http_503'):
+            return FakeResponse(int(fault[-3:]), '{}')
+        body = self._answer(params['from_date'])
+        if fault == 'truncated':
+            return FakeResponse(200, body[:len(body) // 2])
+        if fault == 'invalid_json':
+            return FakeResponse(200, '<html>Bad gateway</html>')
+        self.current['api_ok'] = True
+        return FakeResponse(200, body)
+
+    def _answer(self, from_date):
+        homeworks = [
+            {
+                'id': id,
+                'homework_name': f'hw{id}',
+                'status': status,
+                'date_updated': _format(START + at),
+            }
+            for at, id, status in reversed(self.events)
+            if from_date <= START + at <= self.now
+        ]
+        return json.dumps(
+            {'homeworks': homeworks, 'current_date': int(self.now)}
+        )
+
+    def _crash(self, error):
+        """Count the crash and restart after restart_delay.
+
+        main() sleeps in ``finally``, so an error raised from its error
+        handler escapes only after the cycle has already been finished.
+        """
+        if self.current['requests'] or self.current['delivered']:
+            self.crashes.append((self.cycle, repr(error)))
+            self._finish_cycle()
+        else:
+            self.crashes.append((self.cycle - 1, repr(error)))
+        self.now += self.restart_delay
+        self.current = self._new_cycle()
+
+    def _new_cycle(self):
+        return {'start': self.now, 'requests': 0, 'api_ok': False,
+                'delivered': 0, 'notified': []}
+
+    def _finish_cycle(self):
+        record = self.current
+        record['end'] = self.now
+        record['faulty'] = (
+            self.cycle in self.api_faults or self.cycle in self.bot_faults
+            or self.cycle in self.crash_after
+        )
+        record['ok'] = record['api_ok'] and record['delivered'] > 0
+        self.cycles.append(record)
+        self.cycle += 1
+
+    def _recoveries(self):
+        """Time from the last faulty cycle to the end of the next ok one."""
+        recoveries = []
+        index = 0
+        while index < len(self.cycles):
+            if not self.cycles[index]['faulty']:
+                index += 1
+                continue
+            while index < len(self.cycles) and self.cycles[index]['faulty']:
+                index += 1
+            if index == len(self.cycles):
+                recoveries.append(None)
+                break
+            cleared = self.cycles[index - 1]['end']
+            recovered = next(
+                (cycle['end'] for cycle in self.cycles[index:]
+                 if cycle['ok']), None
+            )
+            recoveries.append(
+                None if recovered is None else recovered - cleared
+            )
+        return recoveries
+
+
+def _format(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        DATE_FORMAT
+    )
+
+
+def degradation(baseline, report):
+    """Share of throughput lost compared to the baseline run."""
+    if not baseline['throughput_per_hour']:
+        return 0.0
+    return 1 - report['throughput_per_hour'] / baseline['throughput_per_hour']
+
+
+SCENARIOS = {
+    'baseline': {},
+    'api_outage': {'api_faults': {
+        3: 'reset', 4: 'http_500', 5: 'http_503', 6: 'http_429',
+    }},
+    'bad_payloads': {'api_faults': {3: 'truncated', 4: 'invalid_json'}},
+    'latency_spikes': {'api_faults': {i: 'latency' for i in range(2, 8)}},
+    'telegram_down': {'bot_faults': {i: 'telegram_network'
+                                     for i in range(3, 6)}},
+    'restarts': {'crash_after': (3, 4)},
+    'telegram_and_api_down': {
+        'api_faults': {3: 'http_500', 4: 'http_500'},
+        'bot_faults': {3: 'telegram_timeout', 4: 'telegram_timeout'},
+    },
+}
+EVENTS = (
+    (1000, 1, 'reviewing'),
+    (2500, 1, 'rejected'),
+    (4000, 2, 'reviewing'),
+    (6000, 2, 'approved'),
+)
+
+
+def main():
+    """Print the report for every built-in scenario."""
+    baseline = FaultHarness(EVENTS).run(20)
+    columns = ('lost', 'duplicated', 'crashes', 'max_time_to_recover')
+    print(f'{"scenario":<24}' + ''.join(f'{c:>22}' for c in columns)
+          + f'{"degradation":>14}')
+    for name, faults in SCENARIOS.items():
+        report = FaultHarness(EVENTS, **faults).run(20)
+        print(f'{name:<24}'
+              + ''.join(f'{str(report[c]):>22}' for c in columns)
+              + f'{degradation(baseline, report):>14.1%}')
+
+
+if __name__ == '__main__':
+    main()
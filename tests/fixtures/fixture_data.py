@@ -19,3 +19,38 @@ def current_timestamp():
 @pytest.fixture
 def api_url():
     return 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+
+
+class FakeClock:
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingBot:
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    @property
+    def messages(self):
+        return [text for _, text, _ in self.calls]
+
+    def send_message(self, chat_id, text, **kwargs):
+        if self.error is not None:
+            raise self.error
+        self.calls.append((chat_id, text, kwargs))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def recording_bot():
+    return RecordingBot()
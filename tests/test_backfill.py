@@ -0,0 +1,101 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+DAY = 24 * 60 * 60
+
+
+def make_homework(id, timestamp, status='approved'):
+    return {
+        'id': id,
+        'homework_name': f'hw{id}',
+        'status': status,
+        'date_updated': datetime.fromtimestamp(
+            timestamp, timezone.utc
+        ).strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }
+
+
+class FakeApi:
+
+    def __init__(self, homeworks, broken=False):
+        self.homeworks = homeworks
+        self.broken = broken
+        self.calls = []
+
+    def __call__(self, from_date):
+        from users_exceptions import GetIncorrectAnswer
+
+        self.calls.append(from_date)
+        if self.broken:
+            raise GetIncorrectAnswer('Несоответствующий код ответа')
+        return {'homeworks': self.homeworks, 'current_date': 100 * DAY}
+
+
+@pytest.fixture
+def history():
+    return [
+        make_homework(1, 5 * DAY, 'reviewing'),
+        make_homework(2, 15 * DAY),
+        make_homework(1, 25 * DAY),
+    ]
+
+
+class TestBackfill:
+
+    def test_single_request_merged_by_id(self, monkeypatch, tmp_path,
+                                         history):
+        import backfill
+
+        api = FakeApi(history)
+        monkeypatch.setattr(backfill, 'get_api_answer', api)
+        path = tmp_path / 'state.json'
+
+        assert backfill.backfill(0, 30 * DAY, str(path))
+
+        assert api.calls == [0], (
+            'История должна загружаться одним запросом'
+        )
+        state = json.loads(path.read_text(encoding='UTF-8'))
+        assert set(state['homeworks']) == {'1', '2'}, (
+            'Работы должны объединяться по id'
+        )
+        assert state['homeworks']['1']['status'] == 'approved', (
+            'Должна сохраняться последняя версия работы'
+        )
+        assert state['current_date'] == 30 * DAY
+
+    def test_out_of_range_is_logged(self, monkeypatch, tmp_path, history,
+                                    caplog):
+        import backfill
+
+        monkeypatch.setattr(backfill, 'get_api_answer', FakeApi(history))
+        path = tmp_path / 'state.json'
+
+        assert backfill.backfill(0, 20 * DAY, str(path))
+        state = json.loads(path.read_text(encoding='UTF-8'))
+        assert state['homeworks']['1']['status'] == 'reviewing'
+        assert any(
+            'вне диапазона' in record.getMessage()
+            for record in caplog.records
+        ), 'Пропущенные работы должны попадать в лог'
+
+    def test_api_error_keeps_state(self, monkeypatch, tmp_path, history):
+        import backfill
+        from state import save_state
+
+        path = tmp_path / 'state.json'
+        saved = {
+            'current_date': 5 * DAY,
+            'homeworks': {'7': make_homework(7, 4 * DAY)},
+        }
+        save_state(str(path), saved)
+        monkeypatch.setattr(
+            backfill, 'get_api_answer', FakeApi(history, broken=True)
+        )
+
+        assert not backfill.backfill(0, 30 * DAY, str(path))
+        assert json.loads(path.read_text(encoding='UTF-8')) == saved, (
+            'Неудачная загрузка не должна менять состояние'
+        )
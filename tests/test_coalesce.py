@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_load(self):
+        from coalesce import SingleFlight
+
+        cache = SingleFlight(ttl=60)
+        started = threading.Event()
+        release = threading.Event()
+        loads = []
+
+        def loader():
+            loads.append(1)
+            started.set()
+            release.wait(5)
+            return {'homeworks': []}
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            futures = [executor.submit(cache.get, 'key', loader)]
+            started.wait(5)
+            futures += [
+                executor.submit(cache.get, 'key', loader) for _ in range(9)
+            ]
+            while cache.stats['shared'] < 9:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result(5) for future in futures]
+
+        assert len(loads) == 1, (
+            'Одинаковые одновременные запросы должны объединяться'
+        )
+        assert all(result is results[0] for result in results)
+
+    def test_ttl_and_lru(self, clock):
+        from coalesce import SingleFlight
+
+        cache = SingleFlight(ttl=10, maxsize=2, clock=clock)
+        assert cache.get('a', lambda: 1) == 1
+        assert cache.get('a', lambda: 2) == 1
+        cache.get('b', lambda: 1)
+        cache.get('a', lambda: 3)
+        cache.get('c', lambda: 1)
+        assert cache.get('b', lambda: 'new') == 'new', (
+            'Давно не использованный ключ должен вытесняться'
+        )
+        clock.now = 11
+        assert cache.get('a', lambda: 4) == 4, (
+            'Устаревший результат не должен возвращаться'
+        )
+
+    def test_errors_are_shared_but_not_cached(self):
+        from coalesce import SingleFlight
+
+        cache = SingleFlight(ttl=60)
+
+        def broken():
+            raise ValueError('сбой')
+
+        with pytest.raises(ValueError):
+            cache.get('key', broken)
+        assert cache.get('key', lambda: 'ok') == 'ok'
+
+
+class TestSharedApiAnswer:
+
+    def test_subscribers_share_request(self, monkeypatch):
+        import homework
+
+        calls = []
+
+        def fake_request(headers, from_date):
+            calls.append((headers['Authorization'], from_date))
+            return {
+                'homeworks': [
+                    {'id': 2, 'date_updated': '2020-09-13T12:26:50Z'},
+                    {'id': 1, 'date_updated': '2020-09-13T12:26:05Z'},
+                ],
+                'current_date': 1600000100,
+            }
+
+        monkeypatch.setattr(homework, 'request_api', fake_request)
+        monkeypatch.setattr(homework, 'api_cache', homework.SingleFlight())
+        first = homework.get_shared_api_answer('token', 1599999960)
+        second = homework.get_shared_api_answer('token', 1600000000)
+        homework.get_shared_api_answer('other', 1599999990)
+
+        assert calls == [
+            ('OAuth token', 1599999960), ('OAuth other', 1599999960)
+        ], 'Запросов должно быть столько, сколько уникальных токенов'
+        assert [hw['id'] for hw in first['homeworks']] == [2, 1]
+        assert [hw['id'] for hw in second['homeworks']] == [2], (
+            'Подписчик получает только работы, обновлённые после его from_date'
+        )
+
+    def test_cursor_does_not_move_backwards(self, monkeypatch):
+        import homework
+
+        calls = []
+
+        def fake_request(headers, from_date):
+            calls.append(from_date)
+            return {'homeworks': [], 'current_date': 1599999970}
+
+        monkeypatch.setattr(homework, 'request_api', fake_request)
+        monkeypatch.setattr(homework, 'api_cache', homework.SingleFlight())
+        first = homework.get_shared_api_answer('token', 1599999960)
+        later = homework.get_shared_api_answer('token', 1600000000)
+
+        assert len(calls) == 1
+        assert first['current_date'] == 1599999970
+        assert later['current_date'] == 1600000000, (
+            'Закэшированный ответ не должен сдвигать время опроса назад'
+        )
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import pytest
+
+
+class RecordingDestination:
+
+    def __init__(self, name, timeout=1, delay=0, error=None):
+        self.name = name
+        self.timeout = timeout
+        self.delay = delay
+        self.error = error
+        self.messages = []
+        self.released = threading.Event()
+
+    def send(self, message):
+        if self.delay:
+            self.released.wait(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.messages.append(message)
+
+
+class TestFanOut:
+
+    def test_all_destinations_receive_message(self):
+        from destinations import fan_out
+
+        destinations = [RecordingDestination(f'd{i}') for i in range(3)]
+        results = fan_out(destinations, 'текст')
+        for destination in destinations:
+            assert destination.messages == ['текст'], (
+                'Сообщение должно доставляться каждому получателю'
+            )
+            assert results[destination] is None
+
+    def test_slow_destination_does_not_block_others(self):
+        from destinations import fan_out
+
+        slow = RecordingDestination('slow', timeout=0.1, delay=5)
+        fast = RecordingDestination('fast')
+        started = time.monotonic()
+        results = fan_out([slow, fast], 'текст')
+        slow.released.set()
+        assert time.monotonic() - started < 1, (
+            'Медленный получатель не должен задерживать отправку'
+        )
+        assert fast.messages == ['текст']
+        assert results[slow] is not None
+
+    def test_failed_destination_is_isolated(self):
+        from destinations import fan_out
+
+        broken = RecordingDestination('broken', error=OSError('нет диска'))
+        working = RecordingDestination('working')
+        results = fan_out([broken, working], 'текст')
+        assert isinstance(results[broken], OSError)
+        assert working.messages == ['текст']
+
+    def test_all_failed_raises(self):
+        from destinations import fan_out
+        from users_exceptions import NotForSend
+
+        broken = RecordingDestination('broken', error=OSError('нет диска'))
+        with pytest.raises(NotForSend):
+            fan_out([broken], 'текст')
+
+    def test_destination_requires_send(self):
+        from destinations import Destination
+
+        with pytest.raises(TypeError):
+            Destination()
+
+    def test_file_destination(self, tmp_path):
+        from destinations import FileDestination
+
+        path = tmp_path / 'notifications.log'
+        FileDestination(str(path)).send('первая\nстрока')
+        FileDestination(str(path)).send('вторая')
+        assert path.read_text(encoding='UTF-8') == 'первая строка\nвторая\n'
+
+
+class FakeWebhookResponse:
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        import requests
+
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Server Error')
+
+
+class TestDestinations:
+
+    def test_extra_chat_ids_are_parsed(self, monkeypatch, recording_bot):
+        import homework
+        from destinations import TelegramDestination
+
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '100')
+        monkeypatch.setattr(
+            homework, 'TELEGRAM_EXTRA_CHAT_IDS', ' 200, ,300 ,'
+        )
+        monkeypatch.setattr(homework, 'NOTIFY_WEBHOOK_URL', None)
+        monkeypatch.setattr(homework, 'NOTIFY_FILE', None)
+        monkeypatch.setattr(homework, 'NOTIFY_TIMEOUT', 7)
+
+        destinations = homework.get_destinations(recording_bot)
+        assert all(
+            isinstance(d, TelegramDestination) for d in destinations
+        )
+        assert [d.chat_id for d in destinations] == ['100', '200', '300'], (
+            'Дополнительные чаты задаются через запятую, пустые пропускаются'
+        )
+        assert {d.timeout for d in destinations} == {7}
+
+    def test_webhook_and_file_are_added(self, monkeypatch, tmp_path,
+                                        recording_bot):
+        import homework
+        from destinations import FileDestination, WebhookDestination
+
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '100')
+        monkeypatch.setattr(homework, 'TELEGRAM_EXTRA_CHAT_IDS', '')
+        monkeypatch.setattr(
+            homework, 'NOTIFY_WEBHOOK_URL', 'http://hook.local/'
+        )
+        monkeypatch.setattr(homework, 'NOTIFY_FILE', str(tmp_path / 'n'))
+
+        destinations = homework.get_destinations(recording_bot)
+        assert [type(d) for d in destinations[1:]] == [
+            WebhookDestination, FileDestination
+        ]
+
+    def test_telegram_destination_passes_timeout(self, recording_bot):
+        from destinations import TelegramDestination
+
+        TelegramDestination(recording_bot, 100, timeout=3).send('текст')
+        assert recording_bot.calls == [(100, 'текст', {'timeout': 3})], (
+            'Таймаут получателя должен передаваться в Telegram'
+        )
+
+    def test_webhook_passes_timeout(self, monkeypatch):
+        import requests
+        from destinations import WebhookDestination
+
+        calls = []
+
+        def fake_post(url, **kwargs):
+            calls.append((url, kwargs))
+            return FakeWebhookResponse(200)
+
+        monkeypatch.setattr(requests, 'post', fake_post)
+        WebhookDestination('http://hook.local/', timeout=4).send('текст')
+        assert calls == [
+            ('http://hook.local/', {'json': {'text': 'текст'}, 'timeout': 4})
+        ]
+
+    def test_webhook_error_status_fails_destination(self, monkeypatch):
+        import requests
+        from destinations import WebhookDestination, fan_out
+
+        monkeypatch.setattr(
+            requests, 'post', lambda url, **kwargs: FakeWebhookResponse(502)
+        )
+        webhook = WebhookDestination('http://hook.local/')
+        with pytest.raises(requests.HTTPError):
+            webhook.send('текст')
+
+        working = RecordingDestination('working')
+        results = fan_out([webhook, working], 'текст')
+        assert isinstance(results[webhook], requests.HTTPError), (
+            'Ответ webhook с ошибкой должен считаться неудачной доставкой'
+        )
+        assert working.messages == ['текст']
@@ -0,0 +1,66 @@
+import pytest
+
+from fault_injection import (
+    API_FAULTS, BOT_FAULTS, EVENTS, FaultHarness, degradation
+)
+
+CYCLES = 12
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    return FaultHarness(
+        EVENTS, state_file=str(tmp_path / 'baseline.json')
+    ).run(CYCLES)
+
+
+class TestFaultInjection:
+
+    def test_baseline(self, baseline):
+        assert baseline['cycles'] == CYCLES
+        assert baseline['ok_cycles'] == CYCLES
+        assert baseline['lost'] == baseline['duplicated'] == 0
+        assert baseline['delivered'] == baseline['expected'] > 0
+        assert baseline['crashes'] == 0
+
+    @pytest.mark.parametrize('fault', API_FAULTS)
+    def test_api_fault_is_survived(self, tmp_path, baseline, fault):
+        import homework
+
+        report = FaultHarness(
+            EVENTS, api_faults={1: fault},
+            state_file=str(tmp_path / 'state.json'),
+        ).run(CYCLES)
+        assert report['crashes'] == 0, (
+            f'Цикл не должен падать при сбое API `{fault}`'
+        )
+        assert report['duplicated'] == 0
+        assert report['max_time_to_recover'] <= homework.RETRY_TIME, (
+            'Бот должен восстанавливаться за один интервал опроса'
+        )
+        assert degradation(baseline, report) < 0.2
+
+    @pytest.mark.parametrize('fault', BOT_FAULTS)
+    def test_telegram_fault_is_survived(self, tmp_path, fault):
+        report = FaultHarness(
+            EVENTS, bot_faults={1: fault},
+            state_file=str(tmp_path / 'state.json'),
+        ).run(CYCLES)
+        assert report['crashes'] == 0
+        assert report['ok_cycles'] == CYCLES - 1
+
+    def test_crashes_are_counted_and_restarted(self, tmp_path):
+        harness = FaultHarness(
+            EVENTS, crash_after={2, 3},
+            state_file=str(tmp_path / 'state.json'),
+        )
+        report = harness.run(CYCLES)
+        assert report['crashes'] == 2, (
+            'Харнесс должен считать падения цикла и перезапускать его'
+        )
+        assert [cycle for cycle, _ in harness.crashes] == [2, 3]
+        assert report['cycles'] == report['ok_cycles'] == CYCLES
+        assert report['lost'] == report['duplicated'] == 0, (
+            'После перезапуска бот продолжает с сохранённого состояния'
+        )
+        assert report['max_time_to_recover'] is not None
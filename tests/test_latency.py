@@ -0,0 +1,64 @@
+class TestLatencyTracker:
+
+    def test_percentiles(self):
+        from latency import RollingPercentiles
+
+        rolling = RollingPercentiles(size=100)
+        assert rolling.percentile(95) is None
+        for value in range(1, 101):
+            rolling.add(value)
+        assert rolling.percentile(50) == 50
+        assert rolling.percentile(95) == 95
+        rolling.add(1000)
+        assert len(rolling) == 100, 'Окно должно быть ограничено'
+
+    def test_breakdown(self):
+        from latency import LatencyTracker
+
+        tracker = LatencyTracker(slo=900)
+        breakdown = tracker.record(
+            updated_at=1000, poll_started=1300, fetched=1302, sent=1303
+        )
+        assert breakdown == {
+            'total': 303, 'polling': 300, 'fetch': 2, 'send': 1
+        }
+        assert not tracker.slo_breached()
+
+    def test_slo_breached(self):
+        from latency import LatencyTracker
+
+        tracker = LatencyTracker(slo=600, percentile=95)
+        for _ in range(10):
+            tracker.record(0, 1000, 1001, 1002)
+        report = tracker.report()
+        assert report['slo_breached'], (
+            'Превышение SLO должно отражаться в отчёте'
+        )
+        assert report['total']['p95'] == 1002
+
+    def test_slo_change_is_logged_once(self, caplog):
+        import logging
+
+        from latency import LatencyTracker
+
+        tracker = LatencyTracker(slo=600, percentile=50, size=3)
+        with caplog.at_level(logging.INFO, logger='latency'):
+            for _ in range(3):
+                tracker.record(0, 1000, 1001, 1002)
+            for _ in range(3):
+                tracker.record(0, 10, 11, 12)
+        warnings = [r for r in caplog.records if 'превышает SLO' in r.message]
+        assert len(warnings) == 1, (
+            'Предупреждение пишется при переходе за SLO, а не на каждое '
+            'уведомление'
+        )
+        assert any('в пределах SLO' in r.message for r in caplog.records)
+
+    def test_dump_and_load(self):
+        from latency import LatencyTracker
+
+        tracker = LatencyTracker(slo=600)
+        tracker.record(0, 10, 11, 12)
+        restored = LatencyTracker(slo=600)
+        restored.load(tracker.dump())
+        assert restored.report() == tracker.report()
@@ -0,0 +1,132 @@
+import gzip
+import logging
+import os
+import time
+
+
+def make_logger(name, *handlers, filters=()):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    for handler in handlers:
+        logger.addHandler(handler)
+    for log_filter in filters:
+        logger.addFilter(log_filter)
+    return logger
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestCompressedRotatingFileHandler:
+
+    def test_rotated_files_are_compressed(self, tmp_path):
+        from log_handlers import CompressedRotatingFileHandler
+
+        path = tmp_path / 'bot.log'
+        handler = CompressedRotatingFileHandler(
+            str(path), maxBytes=200, backupCount=10
+        )
+        logger = make_logger('test_compressed', handler)
+        for i in range(20):
+            logger.info('строка лога номер %s', i)
+        handler.close()
+
+        archives = sorted(tmp_path.glob('bot.log.*.gz'))
+        assert archives, 'Ротированные логи должны сжиматься в .gz'
+        assert not [
+            name for name in os.listdir(tmp_path)
+            if name.startswith('bot.log.') and not name.endswith('.gz')
+        ], 'Несжатые ротированные файлы не должны оставаться на диске'
+        with gzip.open(archives[0], 'rt', encoding='UTF-8') as file:
+            assert 'строка лога номер' in file.read()
+
+    def test_retention_by_count(self, tmp_path):
+        from log_handlers import CompressedRotatingFileHandler
+
+        path = tmp_path / 'bot.log'
+        handler = CompressedRotatingFileHandler(
+            str(path), maxBytes=100, backupCount=2
+        )
+        logger = make_logger('test_retention', handler)
+        for i in range(50):
+            logger.info('строка лога номер %s', i)
+        handler.close()
+        assert len(list(tmp_path.glob('bot.log.*.gz'))) <= 2
+
+
+class TestTracebackSampler:
+
+    def test_repeated_traceback_logged_once(self):
+        from log_handlers import TracebackSampler
+
+        handler = ListHandler()
+        logger = make_logger(
+            'test_sampler', handler, filters=[TracebackSampler()]
+        )
+        for _ in range(3):
+            try:
+                raise ValueError('сбой')
+            except ValueError:
+                logger.error('Сбой в работе программы', exc_info=True)
+
+        assert handler.records[0].exc_info, (
+            'Первый трейсбек должен записываться полностью'
+        )
+        for number, record in enumerate(handler.records[1:], start=1):
+            assert not record.exc_info
+            assert f'повтор {number}' in record.getMessage()
+
+
+class TestRetentionByAge:
+
+    def test_old_archives_removed_on_open(self, tmp_path):
+        from log_handlers import CompressedRotatingFileHandler
+
+        old = tmp_path / 'bot.log.20200101-000000.gz'
+        fresh = tmp_path / 'bot.log.20200102-000000.gz'
+        for archive in (old, fresh):
+            archive.write_bytes(b'')
+        month_ago = time.time() - 30 * 24 * 60 * 60
+        os.utime(old, (month_ago, month_ago))
+
+        handler = CompressedRotatingFileHandler(
+            str(tmp_path / 'bot.log'), maxBytes=10 ** 6, backupCount=10,
+            max_age=7 * 24 * 60 * 60
+        )
+        handler.wait_archived(timeout=5)
+        handler.close()
+
+        assert not old.exists(), (
+            'Архивы старше max_age должны удаляться и без ротации'
+        )
+        assert fresh.exists()
+
+    def test_numbered_backups_are_compressed_and_pruned(self, tmp_path):
+        from log_handlers import CompressedRotatingFileHandler
+
+        for number in range(1, 6):
+            backup = tmp_path / f'bot.log.{number}'
+            backup.write_text(f'старый лог {number}', encoding='UTF-8')
+            changed = time.time() - number * 60
+            os.utime(backup, (changed, changed))
+
+        handler = CompressedRotatingFileHandler(
+            str(tmp_path / 'bot.log'), maxBytes=10 ** 6, backupCount=2
+        )
+        handler.wait_archived(timeout=5)
+        handler.close()
+
+        assert not list(tmp_path.glob('bot.log.[0-9]')), (
+            'Старые нумерованные копии должны сжиматься при открытии'
+        )
+        assert sorted(p.name for p in tmp_path.glob('bot.log.*.gz')) == [
+            'bot.log.1.gz', 'bot.log.2.gz'
+        ], 'Остаются только самые новые архивы'
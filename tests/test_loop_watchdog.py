@@ -0,0 +1,92 @@
+import json
+import logging
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+
+@pytest.fixture
+def watchdog(clock):
+    from loop_watchdog import Watchdog
+
+    return Watchdog({'fetch': 10, 'sleep': 600}, ready_after=100,
+                    clock=clock)
+
+
+class TestWatchdog:
+
+    def test_stall_dumps_stacks_once(self, watchdog, clock, caplog):
+        with caplog.at_level(logging.CRITICAL, logger='loop_watchdog'):
+            with watchdog.stage('fetch'):
+                clock.now = 5
+                assert watchdog.check() is None
+                clock.now = 11
+                assert watchdog.check() == 'fetch'
+                assert watchdog.check() == 'fetch'
+        dumps = [r for r in caplog.records if 'стеки потоков' in r.message]
+        assert len(dumps) == 1, 'Стеки потоков должны выводиться один раз'
+        assert 'Поток MainThread' in dumps[0].message
+        assert watchdog.check() is None
+
+    def test_exit_on_stall(self, watchdog, clock, monkeypatch):
+        import loop_watchdog
+
+        class HungHandler(logging.Handler):
+
+            def emit(self, record):
+                pass
+
+            def flush(self):
+                release.wait()
+
+        codes = []
+        release = threading.Event()
+        handler = HungHandler()
+        monkeypatch.setattr(loop_watchdog.os, '_exit', codes.append)
+        monkeypatch.setattr(loop_watchdog, 'FLUSH_TIMEOUT', 0.1)
+        logging.getLogger().addHandler(handler)
+        watchdog.exit_on_stall = True
+        try:
+            with watchdog.stage('fetch'):
+                clock.now = 11
+                watchdog.check()
+        finally:
+            logging.getLogger().removeHandler(handler)
+            release.set()
+        assert codes == [loop_watchdog.EXIT_STALLED], (
+            'При зависании процесс должен завершаться для перезапуска, '
+            'даже если обработчик лога не отвечает'
+        )
+
+    def test_status(self, watchdog, clock):
+        status = watchdog.status()
+        assert status['alive'] and not status['ready']
+        clock.now = 50
+        watchdog.cycle_succeeded()
+        clock.now = 120
+        status = watchdog.status()
+        assert status['ready']
+        assert status['last_success_age'] == 70
+        clock.now = 200
+        assert not watchdog.status()['ready'], (
+            'Бот не готов, если успешного цикла давно не было'
+        )
+
+    def test_reports_are_added_to_status(self, watchdog):
+        watchdog.reports = {'latency': lambda: {'slo_breached': False}}
+        assert watchdog.status()['latency'] == {'slo_breached': False}
+
+    def test_http_endpoint(self, watchdog, clock):
+        watchdog.check_interval = 60
+        watchdog.start(port=0)
+        try:
+            url = f'http://127.0.0.1:{watchdog._server.server_port}'
+            with urlopen(f'{url}/healthz', timeout=5) as response:
+                assert json.loads(response.read())['alive']
+            with pytest.raises(HTTPError) as error:
+                urlopen(f'{url}/readyz', timeout=5)
+            assert error.value.code == 503
+        finally:
+            watchdog.stop()
@@ -0,0 +1,182 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def bot_env(monkeypatch, tmp_path, recording_bot):
+    import homework
+
+    state_file = tmp_path / 'state.json'
+    bot = recording_bot
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+    monkeypatch.setattr(homework, 'STATE_FILE', str(state_file))
+    monkeypatch.setattr(homework, 'get_bot', lambda: bot)
+    return homework, bot, state_file
+
+
+class TestRunOnce:
+
+    def test_success_saves_state(self, monkeypatch, bot_env):
+        homework, bot, state_file = bot_env
+        sleeps = []
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                           'status': 'approved',
+                           'date_updated': '2020-02-13T14:40:57Z'}],
+            'current_date': 777,
+        })
+
+        monkeypatch.setattr(homework.time, 'sleep', sleeps.append)
+        assert homework.run_once() == homework.EXIT_OK
+        assert sleeps == [], 'Запуск с --once не должен ждать своей фазы'
+        assert bot.messages[0].startswith(
+            'Изменился статус проверки работы "hw1"'
+        )
+        state = json.loads(state_file.read_text(encoding='UTF-8'))
+        assert state['current_date'] == 777, (
+            'После проверки должно сохраняться время последнего опроса'
+        )
+        assert len(state['latency']['total']) == 1, (
+            'Задержка уведомления должна сохраняться в состоянии'
+        )
+
+    def test_homework_without_date_is_delivered(self, monkeypatch,
+                                                bot_env):
+        homework, bot, state_file = bot_env
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                           'status': 'approved', 'date_updated': None}],
+            'current_date': 777,
+        })
+
+        assert homework.run_once() == homework.EXIT_OK, (
+            'Работа без даты обновления не должна считаться сбоем'
+        )
+        assert len(bot.messages) == 1
+        state = json.loads(state_file.read_text(encoding='UTF-8'))
+        assert set(state['homeworks']) == {'1'}
+        assert state['latency']['total'] == []
+
+    def test_api_error(self, monkeypatch, bot_env):
+        from users_exceptions import GetIncorrectAnswer
+
+        homework, bot, state_file = bot_env
+
+        def broken_api(ts):
+            raise GetIncorrectAnswer('Несоответствующий код ответа')
+
+        monkeypatch.setattr(homework, 'get_api_answer', broken_api)
+        assert homework.run_once() == homework.EXIT_FAILURE
+        assert bot.messages[0].startswith('Сбой в работе программы')
+        assert state_file.exists()
+
+    def test_errors_go_to_operator_only(self, monkeypatch, bot_env,
+                                        tmp_path):
+        from users_exceptions import GetIncorrectAnswer
+
+        homework, bot, _ = bot_env
+        notify_file = tmp_path / 'notifications.log'
+        monkeypatch.setattr(homework, 'TELEGRAM_EXTRA_CHAT_IDS', '200,300')
+        monkeypatch.setattr(homework, 'NOTIFY_WEBHOOK_URL', None)
+        monkeypatch.setattr(homework, 'NOTIFY_FILE', str(notify_file))
+
+        def broken_api(ts):
+            raise GetIncorrectAnswer('Несоответствующий код ответа')
+
+        monkeypatch.setattr(homework, 'get_api_answer', broken_api)
+        assert homework.run_once() == homework.EXIT_FAILURE
+        assert len(bot.messages) == 1, (
+            'Сообщение о сбое отправляется только в чат TELEGRAM_CHAT_ID'
+        )
+        assert not notify_file.exists()
+
+    def test_not_sent(self, monkeypatch, bot_env):
+        import telegram
+
+        homework, bot, _ = bot_env
+        bot.error = telegram.TelegramError('недоступен')
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [], 'current_date': 777,
+        })
+        assert homework.run_once() == homework.EXIT_NOT_SENT
+
+    def test_failed_delivery_is_retried(self, monkeypatch, bot_env):
+        import telegram
+
+        homework, bot, state_file = bot_env
+        state_file.write_text(
+            json.dumps({'current_date': 500, 'homeworks': {}}),
+            encoding='UTF-8',
+        )
+        calls = []
+
+        def api(ts):
+            calls.append(ts)
+            return {
+                'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                               'status': 'approved',
+                               'date_updated': '2020-02-13T14:40:57Z'}],
+                'current_date': 777,
+            }
+
+        monkeypatch.setattr(homework, 'get_api_answer', api)
+        bot.error = telegram.TelegramError('недоступен')
+        assert homework.run_once() == homework.EXIT_NOT_SENT
+        state = json.loads(state_file.read_text(encoding='UTF-8'))
+        assert state['current_date'] == 500, (
+            'Время опроса не должно сдвигаться, пока уведомление '
+            'не доставлено'
+        )
+
+        bot.error = None
+        assert homework.run_once() == homework.EXIT_OK
+        assert calls == [500, 500], (
+            'Следующий запуск должен повторить опрос с прежнего времени'
+        )
+        assert bot.messages[0].startswith(
+            'Изменился статус проверки работы "hw1"'
+        )
+        state = json.loads(state_file.read_text(encoding='UTF-8'))
+        assert state['current_date'] == 777
+
+    def test_missing_current_date_is_data_error(self, monkeypatch,
+                                                bot_env):
+        homework, bot, state_file = bot_env
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [],
+        })
+        assert homework.run_once() == homework.EXIT_FAILURE, (
+            'Ответ без current_date — ошибка данных, а не недоставка'
+        )
+        assert bot.messages[0].startswith('Сбой в работе программы')
+
+    def test_unknown_status_is_skipped(self, monkeypatch, bot_env):
+        homework, bot, state_file = bot_env
+        state_file.write_text(
+            json.dumps({'current_date': 500, 'homeworks': {}}),
+            encoding='UTF-8',
+        )
+        calls = []
+
+        def api(ts):
+            calls.append(ts)
+            homeworks = [{'id': 1, 'homework_name': 'hw1',
+                          'status': 'weird',
+                          'date_updated': '2020-02-13T14:40:57Z'}]
+            return {'homeworks': homeworks if ts == 500 else [],
+                    'current_date': 777}
+
+        monkeypatch.setattr(homework, 'get_api_answer', api)
+        assert homework.run_once() == homework.EXIT_FAILURE
+        assert homework.run_once() == homework.EXIT_OK
+        assert calls == [500, 777], (
+            'Работа с неизвестным статусом не должна опрашиваться повторно'
+        )
+
+    def test_no_tokens(self, monkeypatch, bot_env):
+        homework, _, _ = bot_env
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', None)
+        assert homework.run_once() == homework.EXIT_NO_TOKENS
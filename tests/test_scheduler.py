@@ -0,0 +1,133 @@
+import math
+from collections import Counter
+
+
+class TestPhase:
+
+    def test_phase_offset_is_stable_and_inside_interval(self):
+        from scheduler import phase_offset
+
+        for key in ('token-1', 'token-2', 42):
+            offset = phase_offset(key, 600)
+            assert 0 <= offset < 600
+            assert offset == phase_offset(key, 600), (
+                'Смещение должно быть одинаковым для одного ключа'
+            )
+
+    def test_delay_until_phase(self):
+        from scheduler import delay_until_phase, phase_offset
+
+        offset = phase_offset('token', 600)
+        for now in (0, 1234.5, 10 ** 9):
+            delay = delay_until_phase('token', 600, now)
+            assert 0 < delay <= 600
+            remainder = (now + delay - offset) % 600
+            assert min(remainder, 600 - remainder) < 1e-6, (
+                'Запуск должен совпадать с фазой ключа'
+            )
+
+
+class TestTimingWheel:
+
+    def test_targets_fire_once_per_interval_at_own_phase(self, clock):
+        from scheduler import TimingWheel, phase_offset
+
+        fired = Counter()
+        first_fire = {}
+
+        def poll(key):
+            fired[key] += 1
+            first_fire.setdefault(key, clock.now)
+
+        wheel = TimingWheel(tick=1, slots=16, levels=3, clock=clock,
+                            history=1200)
+        for i in range(1000):
+            wheel.add_target(f'token-{i}', poll, 600)
+        for second in range(1, 1201):
+            clock.now = second
+            wheel.advance()
+
+        assert set(fired.values()) == {2}, (
+            'Каждая цель должна опрашиваться раз в интервал'
+        )
+        for key, when in first_fire.items():
+            assert when == (math.ceil(phase_offset(key, 600)) or 600), (
+                'Первый опрос должен происходить в фазе цели'
+            )
+        report = wheel.spread()
+        assert report['targets'] == 1000
+        assert report['peak'] < 10, (
+            'Опросы должны распределяться по интервалу равномерно'
+        )
+
+    def test_reschedule_and_remove(self, clock):
+        from scheduler import TimingWheel
+
+        fired = []
+        wheel = TimingWheel(tick=1, slots=8, levels=3, clock=clock)
+        wheel.add_target('a', fired.append, 300)
+        wheel.add_target('b', fired.append, 300)
+        wheel.reschedule('a', 5)
+        wheel.remove_target('b')
+        clock.now = 5
+        wheel.advance()
+        assert fired == ['a']
+        assert len(wheel) == 1
+
+    def test_callback_error_does_not_stop_wheel(self, clock):
+        from scheduler import TimingWheel
+
+        fired = []
+
+        def broken(key):
+            raise RuntimeError('сбой')
+
+        wheel = TimingWheel(tick=1, slots=8, clock=clock)
+        wheel.add_target('broken', broken, 10)
+        wheel.add_target('ok', fired.append, 10)
+        clock.now = 20
+        wheel.advance()
+        assert fired == ['ok', 'ok']
+
+    def test_executor_errors_are_logged(self, clock, caplog):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from scheduler import TimingWheel
+
+        def broken(key):
+            raise OSError('нет диска')
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            wheel = TimingWheel(tick=1, slots=8, clock=clock,
+                                executor=executor)
+            wheel.add_target('broken', broken, 10)
+            clock.now = 10
+            wheel.advance()
+        assert any(
+            record.exc_info and record.exc_info[0] is OSError
+            for record in caplog.records
+        ), 'Ошибки в пуле потоков должны попадать в лог'
+
+    def test_spread_history_covers_interval(self, clock):
+        from scheduler import TimingWheel
+
+        wheel = TimingWheel(tick=1, slots=16, clock=clock)
+        wheel.add_target('a', lambda key: None, 600)
+        assert wheel._fired.maxlen == 600, (
+            'Отчёт о равномерности должен охватывать весь интервал'
+        )
+
+    def test_phase_key_is_shared(self, clock):
+        from scheduler import TimingWheel
+
+        fired = {}
+        wheel = TimingWheel(tick=1, slots=16, clock=clock)
+        for key in ('chat-1', 'chat-2'):
+            wheel.add_target(
+                key, lambda key: fired.setdefault(key, clock.now), 600,
+                phase_key='token'
+            )
+        for second in range(1, 601):
+            clock.now = second
+            wheel.advance()
+        assert fired['chat-1'] == fired['chat-2']
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+
+class TestSubscribers:
+
+    def test_wheel_polls_subscribers_with_one_request_per_token(
+            self, monkeypatch, tmp_path, clock, recording_bot):
+        import homework
+        from coalesce import SingleFlight
+        from scheduler import TimingWheel
+        from subscribers import SubscriberPoller, schedule
+
+        start = 1600000000
+        clock.now = start
+        requests = []
+
+        def fake_request(headers, from_date):
+            requests.append(headers['Authorization'])
+            return {
+                'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                               'status': 'approved',
+                               'date_updated': '2020-09-13T12:30:00Z'}],
+                'current_date': int(clock.now),
+            }
+
+        monkeypatch.setattr(homework, 'request_api', fake_request)
+        monkeypatch.setattr(homework, 'api_cache', SingleFlight())
+        subscribers = [
+            {'token': 'student', 'chat_id': 1},
+            {'token': 'student', 'chat_id': 2},
+            {'token': 'student', 'chat_id': 3},
+            {'token': 'other', 'chat_id': 4},
+        ]
+        bot = recording_bot
+        state_path = tmp_path / 'state.json'
+        poller = SubscriberPoller(bot, subscribers, str(state_path))
+        for key in poller.subscribers:
+            poller.cursors[key] = start - 100
+        wheel = TimingWheel(clock=clock)
+        schedule(poller, wheel, 600)
+        clock.now = start + 600
+        wheel.advance()
+
+        assert sorted(requests) == ['OAuth other', 'OAuth student'], (
+            'Подписчики одного токена должны делить один запрос к API'
+        )
+        assert sorted(chat for chat, _, _ in bot.calls) == [1, 2, 3, 4]
+        state = json.loads(state_path.read_text(encoding='UTF-8'))
+        assert len(state['subscribers']) == 4
+
+    def test_load_subscribers_checks_fields(self, tmp_path):
+        from subscribers import load_subscribers
+
+        path = tmp_path / 'subscribers.json'
+        path.write_text('[{"token": "t"}]', encoding='UTF-8')
+        with pytest.raises(KeyError):
+            load_subscribers(str(path))